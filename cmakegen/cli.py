@@ -4,12 +4,19 @@ Command-line interface for CMake Generator
 
 import os
 import sys
+import subprocess
+from collections import deque
+
 import click
 
 from cmakegen.scanner import ProjectScanner
 from cmakegen.dependency import DependencyAnalyzer
 from cmakegen.generator import CMakeGenerator
 from cmakegen.config import Config
+from cmakegen.filecache import FileCache
+
+# Share one Config per invocation, created on first use
+pass_config = click.make_pass_decorator(Config, ensure=True)
 
 
 def print_success(message):
@@ -32,6 +39,27 @@ def print_error(message):
     click.echo(f"[cmakeGen] {message}")
 
 
+def run_streaming(cmd, cwd, env, tail_lines=50):
+    """Run a command, echoing its combined output line by line
+
+    Args:
+        cmd: Command and arguments
+        cwd: Working directory
+        env: Environment variables
+        tail_lines: Number of trailing output lines to keep
+
+    Returns:
+        Tuple of (return code, last output lines)
+    """
+    tail = deque(maxlen=tail_lines)
+    with subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT, text=True, bufsize=1) as proc:
+        for line in proc.stdout:
+            click.echo(line, nl=False)
+            tail.append(line.rstrip('\n'))
+    return proc.returncode, list(tail)
+
+
 @click.group()
 @click.version_option()
 def cli():
@@ -44,7 +72,8 @@ def cli():
 @click.option('--project-name', '-n', help='Project name (defaults to directory name)')
 @click.option('--min-version', '-v', default='3.10', help='Minimum CMake version')
 @click.option('--force', '-f', is_flag=True, help='Overwrite existing CMakeLists.txt files')
-def generate(project_path, project_name=None, min_version='3.10', force=False):
+@pass_config
+def generate(config, project_path, project_name=None, min_version='3.10', force=False):
     """Generate CMakeLists.txt files for a C/C++ project"""
     project_path = os.path.abspath(project_path)
     project_name = project_name or os.path.basename(project_path)
@@ -57,7 +86,8 @@ def generate(project_path, project_name=None, min_version='3.10', force=False):
         sys.exit(1)
     
     print_info(f"Scanning project structure in {project_path}...")
-    scanner = ProjectScanner(project_path)
+    file_cache = FileCache()
+    scanner = ProjectScanner(project_path, file_cache=file_cache, detect_main=True)
     project_info = scanner.scan_project()
     
     print_info(f"Found {len(project_info['source_files'])} source files and {len(project_info['header_files'])} header files")
@@ -65,13 +95,11 @@ def generate(project_path, project_name=None, min_version='3.10', force=False):
     
     # Generate CMakeLists.txt files
     print_info("Generating CMakeLists.txt files...")
-    config = Config()
-    generator = CMakeGenerator(project_path, project_name, config)
+    generator = CMakeGenerator(project_path, project_name, config, file_cache=file_cache)
     generated_files = generator.write_cmake_files(project_info['modules'])
     
     print_success(f"Generated {len(generated_files)} CMakeLists.txt files:")
-    for file_path in generated_files:
-        click.echo(f"  - {file_path}")
+    click.echo("\n".join(f"  - {file_path}" for file_path in generated_files))
 
 
 @cli.command()
@@ -88,38 +116,41 @@ def scan(project_path):
     print_success(f"Detected {len(project_info['modules'])} modules")
     
     # Display modules
-    click.echo("\nModules:")
+    lines = ["\nModules:"]
     for module_path, module_info in project_info['modules'].items():
         module_name = module_path if module_path else "(root)"
-        click.echo(f"  - {module_name}: {len(module_info['source_files'])} source files, {len(module_info['header_files'])} header files")
+        lines.append(f"  - {module_name}: {len(module_info['source_files'])} source files, {len(module_info['header_files'])} header files")
+    click.echo("\n".join(lines))
 
 
 @cli.command()
 @click.argument('project_path', type=click.Path(exists=True, file_okay=False, dir_okay=True))
-def analyze(project_path):
+@pass_config
+def analyze(config, project_path):
     """Analyze dependencies between source files"""
     project_path = os.path.abspath(project_path)
 
     print_info(f"Scanning project structure in {project_path}...")
-    scanner = ProjectScanner(project_path)
+    file_cache = FileCache()
+    scanner = ProjectScanner(project_path, file_cache=file_cache)
     project_info = scanner.scan_project()
 
     print_info("Analyzing dependencies...")
-    analyzer = DependencyAnalyzer(project_path)
+    analyzer = DependencyAnalyzer(project_path, file_cache=file_cache, config=config)
     dependencies = analyzer.analyze_dependencies(
         project_info['source_files'],
         project_info['header_files']
     )
 
     # Display dependencies
-    click.echo("\nDependencies:")
+    lines = ["\nDependencies:"]
     for source, deps in dependencies.items():
         if deps:
-            click.echo(f"  - {source} depends on:")
-            for dep in deps:
-                click.echo(f"    - {dep}")
+            lines.append(f"  - {source} depends on:")
+            lines.extend(f"    - {dep}" for dep in deps)
         else:
-            click.echo(f"  - {source} has no dependencies")
+            lines.append(f"  - {source} has no dependencies")
+    click.echo("\n".join(lines))
 
 
 @cli.group()
@@ -129,43 +160,61 @@ def config():
 
 
 @config.command('show')
-def config_show():
+@pass_config
+def config_show(config):
     """Show current configuration"""
-    config = Config()
     config.print_config()
 
 
 @config.command('set-mingw')
 @click.argument('path', type=click.Path(exists=True, file_okay=False, dir_okay=True))
-def config_set_mingw(path):
+@pass_config
+def config_set_mingw(config, path):
     """Set MinGW root path"""
-    config = Config()
     config.set_mingw_path(os.path.abspath(path))
     print_success(f"MinGW path set to: {os.path.abspath(path)}")
 
 
 @config.command('set-generator')
 @click.argument('generator')
-def config_set_generator(generator):
+@pass_config
+def config_set_generator(config, generator):
     """Set CMake generator (e.g., 'MinGW Makefiles', 'Visual Studio 17 2022')"""
-    config = Config()
     config.set_generator(generator)
     print_success(f"CMake generator set to: {generator}")
 
 
 @config.command('set-cpp-standard')
 @click.argument('standard', type=click.Choice(['11', '14', '17', '20', '23']))
-def config_set_cpp_standard(standard):
+@pass_config
+def config_set_cpp_standard(config, standard):
     """Set C++ standard"""
-    config = Config()
     config.set_cpp_standard(standard)
     print_success(f"C++ standard set to: {standard}")
 
 
+@config.command('set-jobs')
+@click.argument('jobs', type=click.IntRange(min=0))
+@pass_config
+def config_set_jobs(config, jobs):
+    """Set number of parallel build jobs (0 uses one job per CPU)"""
+    config.set_parallel_jobs(jobs)
+    print_success(f"Parallel build jobs set to: {jobs or 'auto'}")
+
+
+@config.command('set-build-tool')
+@click.argument('build_tool', type=click.Choice(['auto', 'ninja', 'generator']))
+@pass_config
+def config_set_build_tool(config, build_tool):
+    """Set build tool ('generator' uses the configured CMake generator, 'auto' uses ninja only if none is set)"""
+    config.set_build_tool('' if build_tool == 'auto' else build_tool)
+    print_success(f"Build tool set to: {build_tool}")
+
+
 @config.command('init')
-def config_init():
+@pass_config
+def config_init(config):
     """Initialize default configuration file"""
-    config = Config()
     config.save()
     print_success(f"Configuration initialized at: {config.config_file}")
     print_info("You can now edit the configuration file or use 'cmakegen config set-*' commands")
@@ -174,10 +223,10 @@ def config_init():
 @cli.command()
 @click.argument('project_path', type=click.Path(exists=True, file_okay=False, dir_okay=True))
 @click.option('--clean', '-c', is_flag=True, help='Clean build directory before building')
-def build(project_path, clean=False):
+@pass_config
+def build(config, project_path, clean=False):
     """Build a C/C++ project using CMake"""
     project_path = os.path.abspath(project_path)
-    config = Config()
 
     build_dir = os.path.join(project_path, 'build')
 
@@ -197,8 +246,6 @@ def build(project_path, clean=False):
     cmake_cmd = ['cmake', '..'] + cmake_args
 
     try:
-        import subprocess
-
         # Set up environment variables for MinGW
         env = os.environ.copy()
         mingw_bin = config.config["paths"]["mingw_root"]
@@ -211,25 +258,23 @@ def build(project_path, clean=False):
 
         # Configure project
         print_info(f"Using CMake command: {' '.join(cmake_cmd)}")
-        result = subprocess.run(cmake_cmd, cwd=build_dir, capture_output=True, text=True, env=env)
-        if result.returncode != 0:
+        returncode, tail = run_streaming(cmake_cmd, build_dir, env)
+        if returncode != 0:
             print_error(f"CMake configuration failed:")
-            print_error(f"Return code: {result.returncode}")
-            print_error(f"Stdout: {result.stdout}")
-            print_error(f"Stderr: {result.stderr}")
+            print_error(f"Return code: {returncode}")
+            print_error("Last output:\n" + "\n".join(tail))
             sys.exit(1)
         print_success("Project configured successfully")
 
         # Build project
         print_info("Building project...")
-        make_cmd = config.get_make_command()
-        print_info(f"Using make command: {make_cmd}")
-        result = subprocess.run([make_cmd], cwd=build_dir, capture_output=True, text=True, env=env)
-        if result.returncode != 0:
+        build_cmd = config.get_build_command()
+        print_info(f"Using build command: {' '.join(build_cmd)}")
+        returncode, tail = run_streaming(build_cmd, build_dir, env)
+        if returncode != 0:
             print_error(f"Build failed:")
-            print_error(f"Return code: {result.returncode}")
-            print_error(f"Stdout: {result.stdout}")
-            print_error(f"Stderr: {result.stderr}")
+            print_error(f"Return code: {returncode}")
+            print_error("Last output:\n" + "\n".join(tail))
             sys.exit(1)
         print_success("Project built successfully")
 
@@ -4,7 +4,28 @@ Configuration management for CMake Generator
 
 import os
 import json
-from typing import Dict, Optional
+import shutil
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import click
+
+
+@lru_cache(maxsize=None)
+def _resolved_compiler_paths(mingw_root: str, c_compiler: str, cxx_compiler: str, make_program: str) -> Dict:
+    """Resolve compiler executables under a MinGW root
+
+    Returns:
+        Dictionary mapping 'c', 'cxx' and 'make' to existing executable paths (or None)
+    """
+    resolved = {}
+    for key, program in (("c", c_compiler), ("cxx", cxx_compiler), ("make", make_program)):
+        resolved[key] = None
+        if mingw_root and program:
+            path = os.path.join(mingw_root, "bin", program + ".exe")
+            if os.path.exists(path):
+                resolved[key] = path
+    return resolved
 
 
 class Config:
@@ -32,7 +53,9 @@ class Config:
             "cmake": {
                 "min_version": "3.10",
                 "generator": "MinGW Makefiles",
-                "build_type": "Release"
+                "build_type": "Release",
+                "parallel_jobs": 0,
+                "build_tool": ""
             },
             "compilers": {
                 "c_compiler": "gcc",
@@ -84,7 +107,10 @@ class Config:
         args = []
 
         # Generator
-        if self.config["cmake"]["generator"]:
+        use_ninja = self.get_build_tool() == "ninja"
+        if use_ninja:
+            args.extend(["-G", "Ninja"])
+        elif self.config["cmake"]["generator"]:
             args.extend(["-G", self.config["cmake"]["generator"]])
 
         # Build type
@@ -92,36 +118,67 @@ class Config:
             args.extend(["-DCMAKE_BUILD_TYPE=" + self.config["cmake"]["build_type"]])
 
         # Compilers
-        mingw_root = self.config["paths"]["mingw_root"]
-        if mingw_root and self.config["compilers"]["c_compiler"]:
-            c_compiler_path = os.path.join(mingw_root, "bin", self.config["compilers"]["c_compiler"] + ".exe")
-            if os.path.exists(c_compiler_path):
-                args.extend(["-DCMAKE_C_COMPILER=" + c_compiler_path])
-
-        if mingw_root and self.config["compilers"]["cxx_compiler"]:
-            cxx_compiler_path = os.path.join(mingw_root, "bin", self.config["compilers"]["cxx_compiler"] + ".exe")
-            if os.path.exists(cxx_compiler_path):
-                args.extend(["-DCMAKE_CXX_COMPILER=" + cxx_compiler_path])
-
-        if mingw_root and self.config["compilers"]["make_program"]:
-            make_path = os.path.join(mingw_root, "bin", self.config["compilers"]["make_program"] + ".exe")
-            if os.path.exists(make_path):
-                args.extend(["-DCMAKE_MAKE_PROGRAM=" + make_path])
+        compiler_paths = self._compiler_paths()
+        if compiler_paths["c"]:
+            args.extend(["-DCMAKE_C_COMPILER=" + compiler_paths["c"]])
+
+        if compiler_paths["cxx"]:
+            args.extend(["-DCMAKE_CXX_COMPILER=" + compiler_paths["cxx"]])
+
+        # Ninja is found on PATH by CMake, the make program only applies to Makefile generators
+        if compiler_paths["make"] and not use_ninja:
+            args.extend(["-DCMAKE_MAKE_PROGRAM=" + compiler_paths["make"]])
 
         return args
 
-    def get_make_command(self) -> str:
-        """Get make command path"""
-        mingw_root = self.config["paths"]["mingw_root"]
-        if mingw_root and self.config["compilers"]["make_program"]:
-            make_path = os.path.join(mingw_root, "bin", self.config["compilers"]["make_program"] + ".exe")
-            if os.path.exists(make_path):
-                return make_path
-        return self.config["compilers"]["make_program"]
+    def get_build_tool(self) -> str:
+        """Get build tool
+
+        Returns "ninja" to build with Ninja, or "generator" to build with the
+        configured CMake generator. An empty value only selects ninja when no
+        generator is configured and ninja is on PATH.
+        """
+        build_tool = self.config["cmake"].get("build_tool")
+        if build_tool == "ninja":
+            return build_tool
+        if not build_tool and not self.config["cmake"]["generator"] and shutil.which("ninja"):
+            return "ninja"
+        return "generator"
+
+    def get_build_command(self) -> List[str]:
+        """Get build command run from the build directory
+
+        The job count goes to the native build tool after '--' when its flag is
+        known, since 'cmake --build --parallel' needs CMake 3.12.
+        """
+        jobs = self.get_parallel_jobs()
+        command = ["cmake", "--build", "."]
+        generator = "Ninja" if self.get_build_tool() == "ninja" else self.config["cmake"]["generator"]
+
+        if generator.startswith("Ninja") or (generator.endswith("Makefiles") and not generator.startswith("NMake")):
+            return command + ["--", f"-j{jobs}"]
+        if generator.startswith("Visual Studio"):
+            return command + ["--", f"/m:{jobs}"]
+        return command + ["--parallel", str(jobs)]
+
+    def get_parallel_jobs(self) -> int:
+        """Get number of parallel build jobs, 0 in config means one per CPU"""
+        jobs = self.config["cmake"].get("parallel_jobs") or 0
+        return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+    def _compiler_paths(self) -> Dict:
+        """Get resolved compiler paths for the configured MinGW root"""
+        return _resolved_compiler_paths(
+            self.config["paths"]["mingw_root"],
+            self.config["compilers"]["c_compiler"],
+            self.config["compilers"]["cxx_compiler"],
+            self.config["compilers"]["make_program"],
+        )
 
     def set_mingw_path(self, path: str):
         """Set MinGW root path"""
         self.config["paths"]["mingw_root"] = path
+        _resolved_compiler_paths.cache_clear()
         self.save()
 
     def set_generator(self, generator: str):
@@ -129,6 +186,16 @@ class Config:
         self.config["cmake"]["generator"] = generator
         self.save()
 
+    def set_parallel_jobs(self, jobs: int):
+        """Set number of parallel build jobs"""
+        self.config["cmake"]["parallel_jobs"] = jobs
+        self.save()
+
+    def set_build_tool(self, build_tool: str):
+        """Set build tool"""
+        self.config["cmake"]["build_tool"] = build_tool
+        self.save()
+
     def set_cpp_standard(self, standard: str):
         """Set C++ standard"""
         self.config["project"]["cpp_standard"] = standard
@@ -136,14 +203,19 @@ class Config:
 
     def print_config(self):
         """Print current configuration"""
-        print("[cmakeGen] Current Configuration:")
-        print("[cmakeGen] " + "=" * 40)
-        print(f"[cmakeGen] CMake Generator: {self.config['cmake']['generator']}")
-        print(f"[cmakeGen] CMake Min Version: {self.config['cmake']['min_version']}")
-        print(f"[cmakeGen] Build Type: {self.config['cmake']['build_type']}")
-        print(f"[cmakeGen] C++ Standard: {self.config['project']['cpp_standard']}")
-        print(f"[cmakeGen] MinGW Root: {self.config['paths']['mingw_root']}")
-        print(f"[cmakeGen] C Compiler: {self.config['compilers']['c_compiler']}")
-        print(f"[cmakeGen] CXX Compiler: {self.config['compilers']['cxx_compiler']}")
-        print(f"[cmakeGen] Make Program: {self.config['compilers']['make_program']}")
-        print("[cmakeGen] " + "=" * 40)
\ No newline at end of file
+        lines = [
+            "Current Configuration:",
+            "=" * 40,
+            f"CMake Generator: {self.config['cmake']['generator']}",
+            f"CMake Min Version: {self.config['cmake']['min_version']}",
+            f"Build Type: {self.config['cmake']['build_type']}",
+            f"Parallel Jobs: {self.config['cmake']['parallel_jobs'] or 'auto'}",
+            f"Build Tool: {self.config['cmake']['build_tool'] or 'auto'}",
+            f"C++ Standard: {self.config['project']['cpp_standard']}",
+            f"MinGW Root: {self.config['paths']['mingw_root']}",
+            f"C Compiler: {self.config['compilers']['c_compiler']}",
+            f"CXX Compiler: {self.config['compilers']['cxx_compiler']}",
+            f"Make Program: {self.config['compilers']['make_program']}",
+            "=" * 40,
+        ]
+        click.echo("\n".join(f"[cmakeGen] {line}" for line in lines))
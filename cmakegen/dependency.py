@@ -4,25 +4,130 @@ Dependency analyzer for C/C++ source files
 
 import os
 import re
-from typing import Dict, List, Set, Tuple
+import json
+import mmap
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from .config import Config
+from .filecache import MAX_IO_WORKERS, FileCache
+
+try:
+    import hyperscan
+except ImportError:
+    # Optional dependency, fall back to the re module
+    hyperscan = None
 
 
 class DependencyAnalyzer:
     """Analyzer for C/C++ source file dependencies"""
     
-    # Regular expression for #include directives
-    INCLUDE_PATTERN = re.compile(r'#\s*include\s*[<"]([^>"]+)[>"]')
+    # Regular expression for #include directives, matched against raw file
+    # bytes; matches may not span lines
+    INCLUDE_PATTERN_BYTES = re.compile(rb'#[ \t]*include[ \t]*[<"]([^>"\r\n]+)[>"]')
+
+    # Include cache format version, bump it whenever INCLUDE_PATTERN_BYTES or
+    # the layout of cache entries changes so stale results are discarded
+    CACHE_VERSION = 1
+
+    # Header extensions paired with a source file of the same name
+    HEADER_EXTENSIONS = ('.h', '.hpp', '.hh', '.hxx', '.h++')
     
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, cache_file: Optional[str] = None,
+                 file_cache: Optional[FileCache] = None, config: Optional[Config] = None):
         """Initialize analyzer with project root directory
         
         Args:
             project_root: Path to the project root directory
+            cache_file: Path to include cache file, defaults to include_cache.json
+                next to the config file
+            file_cache: File cache shared with the scanner (optional)
+            config: Configuration used to locate the default cache file (optional)
         """
         self.project_root = os.path.abspath(project_root)
-        
+        self.file_cache = file_cache
+
+        if cache_file is None:
+            config = config or Config()
+            cache_file = os.path.join(os.path.dirname(config.config_file), "include_cache.json")
+
+        self.cache_file = cache_file
+        self._cache: Dict[str, Tuple[int, int, List[str]]] = {}
+        self._cache_dirty = False
+        self._load_cache()
+
+        self._hs_database = None
+        self._hs_local = threading.local()
+        if hyperscan is not None:
+            self._hs_database = hyperscan.Database()
+            self._hs_database.compile(
+                expressions=[self.INCLUDE_PATTERN_BYTES.pattern],
+                ids=[0],
+                elements=1,
+                flags=[hyperscan.HS_FLAG_SOM_LEFTMOST],
+            )
+
+    def _load_cache(self):
+        """Load include cache from file"""
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                # A broken cache is simply rebuilt
+                return
+
+            # A cache written by another version may hold different results
+            if not isinstance(loaded, dict) or loaded.get('version') != self.CACHE_VERSION:
+                return
+
+            entries = loaded.get('entries')
+            if isinstance(entries, dict):
+                # Drop malformed entries rather than failing on them later
+                self._cache = {path: entry for path, entry in entries.items()
+                               if isinstance(entry, list) and len(entry) == 3}
+
+    def _prune_cache(self, source_files: List[str]):
+        """Drop cache entries of this project's files that no longer exist
+
+        Args:
+            source_files: List of the project's current source file paths
+        """
+        current = {os.path.normpath(os.path.join(self.project_root, f)) for f in source_files}
+        prefix = os.path.join(self.project_root, '')
+        stale = [path for path in self._cache if path.startswith(prefix) and path not in current]
+        for path in stale:
+            del self._cache[path]
+        if stale:
+            self._cache_dirty = True
+
+    def flush_cache(self):
+        """Write include cache back to file if it changed"""
+        if not self._cache_dirty:
+            return
+
+        tmp_file = None
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            os.makedirs(cache_dir, exist_ok=True)
+            # Unique temp file so concurrent runs don't write over each other
+            fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.CACHE_VERSION, 'entries': self._cache}, f)
+            os.replace(tmp_file, self.cache_file)
+            self._cache_dirty = False
+        except (IOError, OSError):
+            print(f"Warning: Could not save include cache to {self.cache_file}")
+            if tmp_file and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
     def parse_includes(self, file_path: str) -> List[str]:
         """Parse include directives from a source file
+
+        Results are cached by file modification time and size, so unchanged
+        files are not read again.
         
         Args:
             file_path: Path to the source file
@@ -30,20 +135,98 @@ class DependencyAnalyzer:
         Returns:
             List of included header files
         """
-        includes = []
-        
+        # Normalize so keys match the native paths the scanner puts in the file cache
+        abs_path = os.path.normpath(os.path.join(self.project_root, file_path))
+
+        try:
+            st = self.file_cache.stat(abs_path) if self.file_cache else os.stat(abs_path)
+        except OSError:
+            return []
+
+        cached = self._cache.get(abs_path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return list(cached[2])
+
+        includes = self._scan_includes(abs_path)
+        self._cache[abs_path] = (st.st_mtime_ns, st.st_size, includes)
+        self._cache_dirty = True
+
+        return list(includes)
+
+    def _scan_includes(self, file_path: str) -> List[str]:
+        """Read include directives from a file on disk
+
+        Args:
+            file_path: Absolute path to the source file
+
+        Returns:
+            List of included header files
+        """
+        if self.file_cache:
+            data = self.file_cache.get_contents(file_path)
+            if data is not None:
+                return self._match_includes(data)
+
         try:
-            with open(os.path.join(self.project_root, file_path), 'r', encoding='utf-8') as f:
-                for line in f:
-                    match = self.INCLUDE_PATTERN.search(line)
-                    if match:
-                        includes.append(match.group(1))
-        except (IOError, UnicodeDecodeError):
+            with open(file_path, 'rb') as f:
+                # mmap cannot map empty files
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return self._match_includes(mm)
+        except (IOError, ValueError):
             # Skip files that can't be read
-            pass
-            
-        return includes
+            return []
+
+    def _match_includes(self, data) -> List[str]:
+        """Find include directives in a buffer
+
+        Args:
+            data: File contents
+
+        Returns:
+            List of included header files
+        """
+        # Cheap substring search skips files without any include directive.
+        # Search for 'include' rather than '#include' since '# include' is valid too
+        if data.find(b'include') == -1:
+            return []
+
+        if self._hs_database is not None:
+            return self._hyperscan_includes(data)
+        return [m.group(1).decode('utf-8', 'replace')
+                for m in self.INCLUDE_PATTERN_BYTES.finditer(data)]
     
+    def _hyperscan_includes(self, data) -> List[str]:
+        """Find include directives in a buffer using Hyperscan
+
+        Args:
+            data: File contents
+
+        Returns:
+            List of included header files
+        """
+        # Scratch space must not be shared between threads
+        scratch = getattr(self._hs_local, 'scratch', None)
+        if scratch is None:
+            scratch = hyperscan.Scratch(self._hs_database)
+            self._hs_local.scratch = scratch
+
+        spans = []
+
+        def on_match(pattern_id, start, end, flags, context):
+            spans.append((start, end))
+
+        self._hs_database.scan(data, match_event_handler=on_match, scratch=scratch)
+
+        # Hyperscan has no capture groups, extract the header name from each span
+        includes = []
+        for start, end in spans:
+            match = self.INCLUDE_PATTERN_BYTES.match(data, start, end)
+            if match:
+                includes.append(match.group(1).decode('utf-8', 'replace'))
+        return includes
+
     def analyze_dependencies(self, source_files: List[str], header_files: List[str]) -> Dict[str, List[str]]:
         """Analyze dependencies between source files
 
@@ -56,66 +239,96 @@ class DependencyAnalyzer:
         """
         dependencies = {}
         header_to_source = self._map_headers_to_sources(source_files, header_files)
+        header_index = self._build_header_index(header_files)
+
+        # Reading files is I/O bound, so parse them on a thread pool
+        with ThreadPoolExecutor(max_workers=MAX_IO_WORKERS) as executor:
+            all_includes = list(executor.map(self.parse_includes, source_files))
 
-        for source_file in source_files:
-            dependencies[source_file] = []
-            includes = self.parse_includes(source_file)
+        for source_file, includes in zip(source_files, all_includes):
+            deps = []
+            seen = set()
 
             for include in includes:
                 # Resolve the include path to actual header files
-                resolved_headers = self._resolve_include_path(include, source_file, header_files)
+                resolved_headers = self._resolve_include_path(include, source_file, header_index)
 
                 # For each resolved header, find the corresponding source file
                 for resolved_header in resolved_headers:
-                    header_name = os.path.basename(resolved_header)
+                    header_name = resolved_header.replace('\\', '/').rpartition('/')[2]
                     if header_name in header_to_source:
                         for dep_source in header_to_source[header_name]:
-                            if dep_source != source_file and dep_source not in dependencies[source_file]:
-                                dependencies[source_file].append(dep_source)
+                            if dep_source != source_file and dep_source not in seen:
+                                seen.add(dep_source)
+                                deps.append(dep_source)
+
+            dependencies[source_file] = deps
+
+        self._prune_cache(source_files)
+        self.flush_cache()
 
         return dependencies
 
-    def _resolve_include_path(self, include_path: str, source_file: str, header_files: List[str]) -> List[str]:
+    def _build_header_index(self, header_files: List[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Index header files for include resolution
+
+        Args:
+            header_files: List of header file paths
+
+        Returns:
+            Dictionary with 'path', 'suffix' (last two path components) and 'name'
+            indexes, each mapping a normalized key to header file paths
+        """
+        index = {'path': {}, 'suffix': {}, 'name': {}}
+
+        for header in header_files:
+            normalized = header.replace('\\', '/')
+            parent, _, name = normalized.rpartition('/')
+            index['path'].setdefault(normalized, []).append(header)
+            if parent:
+                index['suffix'].setdefault(parent.rpartition('/')[2] + '/' + name, []).append(header)
+            index['name'].setdefault(name, []).append(header)
+
+        return index
+
+    def _resolve_include_path(self, include_path: str, source_file: str,
+                              header_index: Dict[str, Dict[str, List[str]]]) -> List[str]:
         """Resolve include path to actual header files
 
+        Candidates are probed from most to least specific: path relative to the
+        including file, path relative to the project root, last two path
+        components, and finally base name.
+
         Args:
             include_path: Path from #include directive
             source_file: Path to the source file containing the include
-            header_files: List of all header files in the project
+            header_index: Header index from _build_header_index
 
         Returns:
             List of resolved header file paths
         """
-        resolved_headers = []
+        include = include_path.replace('\\', '/')
 
         # If it's an absolute path, check directly
         if os.path.isabs(include_path):
-            if include_path in header_files:
-                resolved_headers.append(include_path)
-            return resolved_headers
+            return list(header_index['path'].get(include, []))
 
-        # Get source file directory
-        source_dir = os.path.dirname(source_file)
+        include = os.path.normpath(include).replace('\\', '/')
+        source_dir = source_file.replace('\\', '/').rpartition('/')[0]
+        relative = os.path.normpath(source_dir + '/' + include).replace('\\', '/') if source_dir else include
 
-        # Try to resolve the include path relative to the source file
-        resolved_path = os.path.normpath(os.path.join(source_dir, include_path))
+        parent, _, name = include.rpartition('/')
+        probes = [('path', relative), ('path', include)]
+        if parent:
+            probes.append(('suffix', parent.rpartition('/')[2] + '/' + name))
+        probes.append(('name', name))
 
-        # Convert to forward slashes for consistency
-        resolved_path = resolved_path.replace('\\', '/')
+        for kind, key in probes:
+            headers = header_index[kind].get(key)
+            if headers:
+                return list(headers)
 
-        # Check if the resolved path exists in header files
-        for header in header_files:
-            header_normalized = header.replace('\\', '/')
-            if header_normalized == resolved_path or header_normalized.endswith('/' + resolved_path):
-                resolved_headers.append(header)
-
-        # Also check by base name as fallback
-        include_base = os.path.basename(include_path)
-        for header in header_files:
-            if os.path.basename(header) == include_base and header not in resolved_headers:
-                resolved_headers.append(header)
-
-        return resolved_headers
+        return []
     
     def _map_headers_to_sources(self, source_files: List[str], header_files: List[str]) -> Dict[str, List[str]]:
         """Map header files to their corresponding source files
@@ -129,36 +342,22 @@ class DependencyAnalyzer:
         """
         header_to_source = {}
 
-        # Create mapping of header base names to their full paths
-        header_map = {}
+        # Group header base names by stem once, so each source needs a single lookup
+        stem_to_names = {}
         for header in header_files:
             header_name = os.path.basename(header)
-            if header_name not in header_map:
-                header_map[header_name] = []
-            header_map[header_name].append(header)
-
-        # Create mapping of relative paths to actual header files
-        relative_header_map = {}
-        for header in header_files:
-            # Store the header itself
-            if header not in relative_header_map:
-                relative_header_map[header] = []
-            relative_header_map[header].append(header)
+            stem, ext = os.path.splitext(header_name)
+            if ext in self.HEADER_EXTENSIONS:
+                names = stem_to_names.setdefault(stem, [])
+                # Headers sharing a base name map to the same key
+                if header_name not in names:
+                    names.append(header_name)
 
-        # For each source file, find its corresponding header
+        # For each source file, find its corresponding headers
         for source in source_files:
-            source_base = os.path.basename(source)
-            source_name, _ = os.path.splitext(source_base)
-            source_dir = os.path.dirname(source)
-
-            # Check for headers with matching name
-            for ext in ['.h', '.hpp', '.hh', '.hxx', '.h++']:
-                header_name = source_name + ext
-                if header_name in header_map:
-                    for header_path in header_map[header_name]:
-                        if header_name not in header_to_source:
-                            header_to_source[header_name] = []
-                        header_to_source[header_name].append(source)
+            source_name, _ = os.path.splitext(os.path.basename(source))
+            for header_name in stem_to_names.get(source_name, ()):
+                header_to_source.setdefault(header_name, []).append(source)
 
         return header_to_source
     
@@ -174,23 +373,85 @@ class DependencyAnalyzer:
         """
         direct_deps = self.analyze_dependencies(source_files, header_files)
         graph = {src: set(deps) for src, deps in direct_deps.items()}
-        
-        # Resolve transitive dependencies
         for src in source_files:
             if src not in graph:
                 graph[src] = set()
-            
-            # Use depth-first search to find all transitive dependencies
-            visited = set()
-            stack = list(graph[src])
-            
-            while stack:
-                dep = stack.pop()
-                if dep not in visited and dep != src:
-                    visited.add(dep)
-                    if dep in graph:
-                        stack.extend(d for d in graph[dep] if d not in visited)
-            
-            graph[src] = visited
-        
-        return graph
\ No newline at end of file
+
+        # Files in the same cycle reach the same set of files, so compute the
+        # closure once per strongly connected component. Each closure is built
+        # from its successors' closures, so this pass is inherently sequential;
+        # it stays linear in the size of the graph
+        reach = {}
+        for component in self._strongly_connected_components(graph):
+            closure = set(component)
+            for node in component:
+                for dep in graph[node]:
+                    if dep not in closure:
+                        closure |= reach[dep]
+            closure = frozenset(closure)
+            for node in component:
+                reach[node] = closure
+
+        # Copy each closure once; a file only reaches itself through a cycle
+        result = {}
+        for src in graph:
+            closure = set(reach[src])
+            closure.discard(src)
+            result[src] = closure
+
+        return result
+
+    def _strongly_connected_components(self, graph: Dict[str, Set[str]]) -> List[List[str]]:
+        """Find strongly connected components with Tarjan's algorithm
+
+        Args:
+            graph: Dictionary mapping each node to its direct successors
+
+        Returns:
+            List of components, each one listed after all components it depends on
+        """
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+
+        for root in graph:
+            if root in index:
+                continue
+
+            # Iterative DFS to avoid hitting the recursion limit on deep include chains
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph[root]))]
+
+            while work:
+                node, successors = work[-1]
+                for succ in successors:
+                    if succ not in graph:
+                        continue
+                    if succ not in index:
+                        index[succ] = lowlink[succ] = len(index)
+                        stack.append(succ)
+                        on_stack.add(succ)
+                        work.append((succ, iter(graph[succ])))
+                        break
+                    if succ in on_stack:
+                        lowlink[node] = min(lowlink[node], index[succ])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+
+        return components
@@ -0,0 +1,134 @@
+"""
+Shared file metadata and content cache
+"""
+
+import os
+import mmap
+from typing import Dict, Optional, Pattern
+
+
+class FileCache:
+    """Cache of file stats and small file contents shared between passes"""
+
+    # Files up to this size are read whole, larger ones are left to the caller
+    MAX_CONTENT_SIZE = 64 * 1024
+
+    def __init__(self, retain_contents: bool = False):
+        """Initialize an empty cache
+
+        Args:
+            retain_contents: Keep small file contents in memory once read, only
+                worth it when a later pass reads the same files again
+        """
+        self.retain_contents = retain_contents
+        self._stats: Dict[str, os.stat_result] = {}
+        self._entries: Dict[str, os.DirEntry] = {}
+        self._contents: Dict[str, bytes] = {}
+
+    def stat(self, path: str) -> os.stat_result:
+        """Get stat result for a file, calling stat only on first use
+
+        Files recorded with add_entry are stat'ed through their directory
+        entry, which on Windows needs no extra system call.
+
+        Args:
+            path: Absolute path to the file
+
+        Returns:
+            Stat result of the file
+
+        Raises:
+            OSError: If the file cannot be stat'ed
+        """
+        st = self._stats.get(path)
+        if st is None:
+            entry = self._entries.pop(path, None)
+            st = entry.stat() if entry is not None else os.stat(path)
+            self._stats[path] = st
+        return st
+
+    def add_entry(self, entry: os.DirEntry):
+        """Record a directory entry from os.scandir for a later stat() call
+
+        Args:
+            entry: Directory entry of the file
+        """
+        self._entries[entry.path] = entry
+
+    def get_contents(self, path: str) -> Optional[bytes]:
+        """Get the contents of a small file
+
+        Contents are only kept for later calls if the cache retains contents.
+
+        Args:
+            path: Absolute path to the file
+
+        Returns:
+            File contents, or None if the file is too large to retain or can't be read
+        """
+        data = self._contents.get(path)
+        if data is not None:
+            return data
+
+        try:
+            if self.stat(path).st_size > self.MAX_CONTENT_SIZE:
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+
+        if self.retain_contents:
+            self._contents[path] = data
+        return data
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._stats.clear()
+        self._entries.clear()
+        self._contents.clear()
+
+
+# Upper bound on threads used for concurrent file reads and writes
+MAX_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Below this size a plain read is cheaper than setting up a memory map
+MMAP_THRESHOLD = 4 * 1024
+
+# Larger files are searched in their first bytes before mapping the whole file
+HEAD_SIZE = 64 * 1024
+
+
+def search_file(path: str, pattern: Pattern[bytes], file_cache: Optional[FileCache] = None) -> bool:
+    """Check if a file matches a bytes regular expression
+
+    Small files are read directly (or taken from the cache), larger ones are
+    memory mapped so they are neither copied nor decoded. Files beyond
+    HEAD_SIZE are first searched in their leading bytes, where matches such
+    as a main() definition usually are, and only mapped in full on a miss.
+
+    Args:
+        path: Absolute path to the file
+        pattern: Compiled bytes pattern
+        file_cache: File cache to take contents from (optional)
+
+    Returns:
+        True if the pattern matches, False otherwise or if the file can't be read
+    """
+    data = file_cache.get_contents(path) if file_cache else None
+    if data is not None:
+        return pattern.search(data) is not None
+
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return False
+            if size < MMAP_THRESHOLD:
+                return pattern.search(f.read()) is not None
+            if size > HEAD_SIZE and pattern.search(f.read(HEAD_SIZE)) is not None:
+                return True
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return pattern.search(mm) is not None
+    except (IOError, ValueError):
+        return False
@@ -3,24 +3,64 @@ CMakeLists.txt generator for C/C++ projects
 """
 
 import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Set, Optional, Tuple
 from .config import Config
+from .filecache import MAX_IO_WORKERS, FileCache, search_file
+from .scanner import ProjectScanner
+
+# Same main() pattern the scanner uses for detect_main
+_MAIN_RE = ProjectScanner.MAIN_PATTERN
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    """Write content to a file as UTF-8 unless it already holds exactly that content
+
+    Leaving unchanged files untouched keeps their timestamps, so CMake does
+    not regenerate the build system on a no-op rerun.
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    data = content.encode('utf-8')
+
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except IOError:
+        pass
+
+    # Write the encoded bytes straight to the descriptor, no buffering or newline translation
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+    return True
 
 
 class CMakeGenerator:
     """Generator for CMakeLists.txt files"""
     
-    def __init__(self, project_root: str, project_name: str = None, config: Optional[Config] = None):
+    def __init__(self, project_root: str, project_name: str = None, config: Optional[Config] = None,
+                 file_cache: Optional[FileCache] = None):
         """Initialize generator with project root directory
 
         Args:
             project_root: Path to the project root directory
             project_name: Name of the project (defaults to directory name)
             config: Configuration object (optional)
+            file_cache: File cache shared with the scanner (optional)
         """
         self.project_root = os.path.abspath(project_root)
         self.project_name = project_name or os.path.basename(self.project_root)
         self.config = config or Config()
+        self.file_cache = file_cache
         
     def generate_root_cmake(self, modules: Dict[str, Dict], min_version: str = "3.10") -> str:
         """Generate root CMakeLists.txt content
@@ -50,23 +90,17 @@ class CMakeGenerator:
         include_dirs = set()
         # Add parent directories of modules with headers to support hierarchical includes
         parent_include_dirs = set()
+        # Modules that become library targets, as (path, target name, has sources)
+        library_modules = []
         
         for module_path, module_info in modules.items():
-            # Add directory for modules with header files
-            if module_info.get('header_files'):
-                module_dir = module_path if module_path else "."
-                include_dirs.add(module_dir)
-                
-                # Also add parent directory to support includes like "subdir/header.h"
-                if module_path and module_path != ".":
-                    parent_dir = os.path.dirname(module_path)
-                    if parent_dir:
-                        parent_include_dirs.add(parent_dir)
-                        
-            # Also add directory for modules with source files (they might have local headers)
-            if module_info.get('source_files'):
-                module_dir = module_path if module_path else "."
-                include_dirs.add(module_dir)
+            has_sources = bool(module_info.get('source_files'))
+
+            # Add directory for modules with header files, or with source files
+            # (they might have local headers)
+            if has_sources or module_info.get('header_files'):
+                include_dirs.add(module_path or ".")
+                library_modules.append((module_path, os.path.basename(module_path) if module_path else self.project_name, has_sources))
                 
                 # Also add parent directory to support includes like "subdir/header.h"
                 if module_path and module_path != ".":
@@ -79,25 +113,17 @@ class CMakeGenerator:
         
         if all_include_dirs:
             lines.append("include_directories(")
-            for include_dir in sorted(all_include_dirs):
-                # 使用正斜杠替换反斜杠，确保CMake路径兼容性
-                # 确保路径格式正确，相对于项目根目录
-                if include_dir == ".":
-                    lines.append("    .")
-                else:
-                    lines.append(f"    {include_dir.replace(os.path.sep, '/')}")
+            lines.extend(f"    {include_dir}" for include_dir in sorted(all_include_dirs))
             lines.append(")\n")
 
         # Determine if there's a main file to identify the executable target
         main_module = self._find_main_module(modules)
 
         # Add subdirectories for modules
-        non_root_modules = [path for path in modules.keys() if path]
+        non_root_modules = sorted(path for path in modules if path)
         if non_root_modules:
             lines.append("# Add subdirectories")
-            for module_path in sorted(non_root_modules):
-                # 使用正斜杠替换反斜杠，确保CMake路径兼容性
-                lines.append(f"add_subdirectory({module_path.replace(os.path.sep, '/')})")
+            lines.extend(f"add_subdirectory({module_path})" for module_path in non_root_modules)
             lines.append("")
 
         # Handle executable target
@@ -109,11 +135,7 @@ class CMakeGenerator:
                 lines.extend(self._generate_target("${PROJECT_NAME}", module_info, "executable"))
                 
                 # Link with library modules
-                library_targets = []
-                for path, info in modules.items():
-                    if path and (info.get('source_files') or info.get('header_files')):
-                        lib_name = os.path.basename(path) if path else self.project_name
-                        library_targets.append(lib_name)
+                library_targets = [name for path, name, _ in library_modules if path]
 
                 if library_targets:
                     lines.append(f"target_link_libraries(${{PROJECT_NAME}} {' '.join(library_targets)})")
@@ -124,15 +146,11 @@ class CMakeGenerator:
                 source_files = module_info.get('source_files', [])
                 if source_files:
                     lines.append(f"add_executable({self.project_name})")
-                    for source in source_files:
-                        lines.append(f"target_sources({self.project_name} PRIVATE {source.replace(os.path.sep, '/')})")
+                    lines.extend(f"target_sources({self.project_name} PRIVATE {source})"
+                                 for source in source_files)
 
                     # Link with library modules
-                    library_targets = []
-                    for path, info in modules.items():
-                        if path != module_path and (info.get('source_files') or info.get('header_files')):
-                            lib_name = os.path.basename(path) if path else self.project_name
-                            library_targets.append(lib_name)
+                    library_targets = [name for path, name, _ in library_modules if path != module_path]
 
                     if library_targets:
                         lines.append(f"target_link_libraries({self.project_name} {' '.join(library_targets)})")
@@ -141,11 +159,7 @@ class CMakeGenerator:
                     lines.append(f"add_executable({self.project_name} main.cpp)")
 
                     # Link with library modules
-                    library_targets = []
-                    for path, info in modules.items():
-                        if info.get('source_files'):
-                            lib_name = os.path.basename(path) if path else self.project_name
-                            library_targets.append(lib_name)
+                    library_targets = [name for _, name, has_sources in library_modules if has_sources]
 
                     if library_targets:
                         lines.append(f"target_link_libraries({self.project_name} {' '.join(library_targets)})")
@@ -168,8 +182,8 @@ class CMakeGenerator:
 
         # Adjust file paths to be relative to module directory
         adjusted_module_info = {
-            'source_files': [os.path.relpath(f, module_path) if module_path else f for f in module_info.get('source_files', [])],
-            'header_files': [os.path.relpath(f, module_path) if module_path else f for f in module_info.get('header_files', [])]
+            'source_files': [posixpath.relpath(f, module_path) if module_path else f for f in module_info.get('source_files', [])],
+            'header_files': [posixpath.relpath(f, module_path) if module_path else f for f in module_info.get('header_files', [])]
         }
 
         lines = []
@@ -186,21 +200,21 @@ class CMakeGenerator:
         Returns:
             Tuple of (module_path, module_info) or None if not found
         """
-        import re
-
-        main_pattern = re.compile(r'int\s+main\s*\(')
-
-        for module_path, module_info in modules.items():
+        # Use main() detection done by the scanner when every module carries it
+        if modules and all('has_main' in info for info in modules.values()):
+            main_module = next(((path, info) for path, info in modules.items() if info['has_main']), None)
+            if main_module:
+                return main_module
+            modules_to_search = {}
+        else:
+            modules_to_search = modules
+
+        for module_path, module_info in modules_to_search.items():
             source_files = module_info.get('source_files', [])
             for source_file in source_files:
-                file_path = os.path.join(self.project_root, source_file)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if main_pattern.search(content):
-                            return module_path, module_info
-                except (IOError, UnicodeDecodeError):
-                    continue
+                file_path = os.path.normpath(os.path.join(self.project_root, source_file))
+                if search_file(file_path, _MAIN_RE, self.file_cache):
+                    return module_path, module_info
 
         # If no main function found, return the first module with source files
         for module_path, module_info in modules.items():
@@ -226,17 +240,13 @@ class CMakeGenerator:
         # Add source files
         if module_info.get('source_files'):
             lines.append(f"set({target_name}_SOURCES")
-            for source in sorted(module_info['source_files']):
-                # 使用正斜杠替换反斜杠，确保CMake路径兼容性
-                lines.append(f"    {source.replace(os.path.sep, '/')}")
+            lines.extend(f"    {source}" for source in sorted(module_info['source_files']))
             lines.append(")")
 
             # Add header files if available
             if module_info.get('header_files'):
                 lines.append(f"\nset({target_name}_HEADERS")
-                for header in sorted(module_info['header_files']):
-                    # 使用正斜杠替换反斜杠，确保CMake路径兼容性
-                    lines.append(f"    {header.replace(os.path.sep, '/')}")
+                lines.extend(f"    {header}" for header in sorted(module_info['header_files']))
                 lines.append(")")
                 lines.append(f"\nsource_group(\"Header Files\" FILES ${{{target_name}_HEADERS}})")
                 lines.append(f"source_group(\"Source Files\" FILES ${{{target_name}_SOURCES}})")
@@ -259,14 +269,19 @@ class CMakeGenerator:
             List of generated CMakeLists.txt file paths
         """
         generated_files = []
+        # Contents are generated first, then written on a thread pool
+        pending_writes = []
         
         # Generate root CMakeLists.txt
         root_cmake_path = os.path.join(self.project_root, "CMakeLists.txt")
         root_content = self.generate_root_cmake(modules)
-        with open(root_cmake_path, 'w') as f:
-            f.write(root_content)
+        pending_writes.append((root_cmake_path, root_content))
         generated_files.append(os.path.relpath(root_cmake_path, self.project_root))
         
+        # Create module directories up front, makedirs creates missing parents
+        for module_dir in {os.path.join(self.project_root, path) for path in modules if path}:
+            os.makedirs(module_dir, exist_ok=True)
+
         # Generate CMakeLists.txt for each non-root module
         for module_path, module_info in modules.items():
             if not module_path:  # Skip root module
@@ -275,7 +290,6 @@ class CMakeGenerator:
             # For modules without source files (header-only modules), 
             # we still generate a CMakeLists.txt file with an INTERFACE library
             module_dir = os.path.join(self.project_root, module_path)
-            os.makedirs(module_dir, exist_ok=True)
             
             module_cmake_path = os.path.join(module_dir, "CMakeLists.txt")
             
@@ -285,18 +299,23 @@ class CMakeGenerator:
             else:
                 # Header-only module
                 module_name = os.path.basename(module_path)
-                module_content = f"# Header-only library\nadd_library({module_name} INTERFACE)\n"
+                parts = ["# Header-only library\n", f"add_library({module_name} INTERFACE)\n"]
                 
                 # Add header files to the interface library
                 if module_info.get('header_files'):
-                    module_content += f"target_sources({module_name} INTERFACE\n"
+                    parts.append(f"target_sources({module_name} INTERFACE\n")
                     for header in module_info['header_files']:
-                        rel_header_path = os.path.relpath(os.path.join(self.project_root, header), module_dir)
-                        module_content += f"    ${{CMAKE_CURRENT_SOURCE_DIR}}/{rel_header_path.replace(os.path.sep, '/')}\n"
-                    module_content += ")\n"
+                        rel_header_path = posixpath.relpath(header, module_path)
+                        parts.append(f"    ${{CMAKE_CURRENT_SOURCE_DIR}}/{rel_header_path}\n")
+                    parts.append(")\n")
+
+                module_content = "".join(parts)
             
-            with open(module_cmake_path, 'w') as f:
-                f.write(module_content)
+            pending_writes.append((module_cmake_path, module_content))
             generated_files.append(os.path.relpath(module_cmake_path, self.project_root))
+
+        with ThreadPoolExecutor(max_workers=MAX_IO_WORKERS) as executor:
+            # Consume the results so write errors propagate
+            list(executor.map(lambda item: _write_if_changed(*item), pending_writes))
         
         return generated_files
\ No newline at end of file
@@ -4,8 +4,24 @@ Project structure scanner for C/C++ projects
 
 import os
 import re
+from itertools import product
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+
+from .filecache import FileCache, search_file
+
+
+def _extension_kinds(source_extensions: Set[str], header_extensions: Set[str]) -> Dict[str, str]:
+    """Map every upper/lower case spelling of the extensions to 'src' or 'hdr'
+
+    Lets the scanner classify a file with one dict lookup and no str.lower().
+    """
+    kinds = {}
+    for kind, extensions in (('src', source_extensions), ('hdr', header_extensions)):
+        for ext in extensions:
+            for chars in product(*({c.lower(), c.upper()} for c in ext)):
+                kinds[''.join(chars)] = kind
+    return kinds
 
 
 class ProjectScanner:
@@ -27,15 +43,31 @@ class ProjectScanner:
         r'.*\.cmake$',
         r'.*CMakeCache\.txt$',
     ]
+
+    _EXT_KIND = _extension_kinds(SOURCE_EXTENSIONS, HEADER_EXTENSIONS)
+
+    # Regular expression for a main function definition at the start of a line,
+    # optionally after a return type qualifier such as 'static' or 'extern'.
+    # The qualifier stays on one line so a match attempt can't rescan later lines
+    MAIN_PATTERN = re.compile(rb'(?m)^[ \t]*(?:\w[\w \t*&"]*[ \t])?int\s+main\s*\(')
     
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, file_cache: Optional[FileCache] = None,
+                 detect_main: bool = False):
         """Initialize scanner with project root directory
         
         Args:
             project_root: Path to the project root directory
+            file_cache: File cache to populate for later passes (optional)
+            detect_main: Record in each module whether one of its sources defines main()
         """
         self.project_root = os.path.abspath(project_root)
-        self.ignore_patterns = [re.compile(pattern) for pattern in self.IGNORE_PATTERNS]
+        self.file_cache = file_cache
+        self.detect_main = detect_main
+        self._cache = None
+
+        # One alternation checked with search(), so the leading/trailing '.*' are redundant
+        stripped = (re.sub(r'^\.\*|\.\*$', '', pattern) for pattern in self.IGNORE_PATTERNS)
+        self._ignore_re = re.compile('|'.join(f'(?:{pattern})' for pattern in stripped))
         
     def should_ignore(self, path: str) -> bool:
         """Check if a path should be ignored
@@ -46,17 +78,32 @@ class ProjectScanner:
         Returns:
             True if path should be ignored, False otherwise
         """
-        for pattern in self.ignore_patterns:
-            if pattern.match(path):
-                return True
-        return False
+        return self._ignore_re.search(path) is not None
     
+    def invalidate(self):
+        """Drop cached scan results so the next scan walks the project again"""
+        self._cache = None
+
+    def rescan(self) -> Dict[str, Dict]:
+        """Scan project structure again, ignoring cached results
+        
+        Returns:
+            Dictionary containing project structure information
+        """
+        self.invalidate()
+        return self.scan_project()
+
     def scan_project(self) -> Dict[str, Dict]:
         """Scan project structure
+
+        The result is cached, use rescan() to pick up changes on disk.
         
         Returns:
             Dictionary containing project structure information
         """
+        if self._cache is not None:
+            return self._cache
+
         project_info = {
             'root': self.project_root,
             'modules': {},
@@ -65,66 +112,113 @@ class ProjectScanner:
             'include_dirs': set(),
         }
         
-        # Walk through project directory
-        for root, dirs, files in os.walk(self.project_root):
-            # Skip ignored directories
-            if self.should_ignore(root):
+        if self.should_ignore(self.project_root):
+            directories = []
+        else:
+            directories = [self.project_root]
+
+        # Walk through project directory depth-first, in the same order as os.walk,
+        # reusing the type information scandir already has for each entry
+        while directories:
+            root = directories.pop()
+
+            try:
+                with os.scandir(root) as it:
+                    entries = list(it)
+            except OSError:
                 continue
-                
+
+            # Paths are stored with forward slashes, the form CMake expects
+            module_path = os.path.relpath(root, self.project_root).replace(os.sep, '/')
+            if module_path == '.':
+                module_path = ''
+
             # Process files in current directory
             source_files = []
             header_files = []
+            subdirs = []
+            has_main = False
             
-            for file in files:
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, self.project_root)
-                
-                # Skip ignored files
-                if self.should_ignore(file_path):
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    # Prune ignored directories before descending, like os.walk skip symlinked ones
+                    if not entry.is_symlink() and not self.should_ignore(entry.path):
+                        subdirs.append(entry.path)
                     continue
+
+                # Check file extension. The directory was already checked against the
+                # ignore patterns, and the file-level ones (.cmake, CMakeCache.txt)
+                # never have a source or header extension
+                kind = self._EXT_KIND.get(os.path.splitext(entry.name)[1])
+                if kind is None:
+                    continue
+
+                rel_path = module_path + '/' + entry.name if module_path else entry.name
                 
-                # Check file extension
-                _, ext = os.path.splitext(file)
-                
-                if ext.lower() in self.SOURCE_EXTENSIONS:
+                if kind == 'src':
                     source_files.append(rel_path)
                     project_info['source_files'].append(rel_path)
+
+                    if self.detect_main and not has_main:
+                        has_main = self._contains_main(entry.path)
                     
-                elif ext.lower() in self.HEADER_EXTENSIONS:
+                else:
                     header_files.append(rel_path)
                     project_info['header_files'].append(rel_path)
                     
                     # Add directory to include dirs if it contains headers
-                    include_dir = os.path.dirname(file_path)
-                    if include_dir:
-                        project_info['include_dirs'].add(
-                            os.path.relpath(include_dir, self.project_root)
-                        )
+                    project_info['include_dirs'].add(module_path or '.')
+
+                # Keep the directory entry so later passes can stat the file
+                # through it, only if they need to
+                if self.file_cache:
+                    self.file_cache.add_entry(entry)
+
+            directories.extend(reversed(subdirs))
             
             # Consider all directories with header files as modules, not just those with source files
-            module_path = os.path.relpath(root, self.project_root)
-            if module_path == '.':
-                module_path = ''
-
             if source_files or header_files:
                 project_info['modules'][module_path] = {
                     'path': module_path,
                     'source_files': source_files,
                     'header_files': header_files,
                 }
+                if self.detect_main:
+                    project_info['modules'][module_path]['has_main'] = has_main
         
         # Convert include_dirs set to list for JSON serialization
         project_info['include_dirs'] = list(project_info['include_dirs'])
-        
+
+        self._cache = project_info
         return project_info
     
-    def get_module_structure(self) -> Dict[str, List[str]]:
+    def _contains_main(self, file_path: str) -> bool:
+        """Check if a source file defines a main function
+
+        Args:
+            file_path: Absolute path to the source file
+
+        Returns:
+            True if the file contains a main function definition
+        """
+        return search_file(file_path, self.MAIN_PATTERN, self.file_cache)
+
+    def get_module_structure(self, project_info: Optional[Dict] = None) -> Dict[str, List[str]]:
         """Get module structure with source files
+
+        Args:
+            project_info: Result of scan_project to reuse (optional)
         
         Returns:
             Dictionary mapping module paths to lists of source files
         """
-        project_info = self.scan_project()
+        if project_info is None:
+            project_info = self.scan_project()
         module_structure = {}
         
         for module_path, module_info in project_info['modules'].items():
@@ -133,11 +227,15 @@ class ProjectScanner:
         
         return module_structure
     
-    def get_include_directories(self) -> List[str]:
+    def get_include_directories(self, project_info: Optional[Dict] = None) -> List[str]:
         """Get list of include directories
+
+        Args:
+            project_info: Result of scan_project to reuse (optional)
         
         Returns:
             List of include directories
         """
-        project_info = self.scan_project()
+        if project_info is None:
+            project_info = self.scan_project()
         return project_info['include_dirs']
\ No newline at end of file
@@ -8,6 +8,9 @@ setup(
     install_requires=[
         "click>=8.0.0",
     ],
+    extras_require={
+        "hyperscan": ["hyperscan"],
+    },
     entry_points={
         "console_scripts": [
             "cmakegen=cmakegen.cli:cli",